@@ -0,0 +1,227 @@
+"""Micro-benchmarks for the translation pipeline.
+
+Run with ``python benchmarks.py <name>``; nothing here talks to the real provider.
+"""
+import argparse
+import statistics
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from chunking import split_into_chunks
+from language import detect_language
+from provider import GoogleClient
+from scheduler import Scheduler
+
+# Mixed selections as the auto loop sees them: English text, our own Tamil popups and
+# history lines, and the occasional other language
+SAMPLE_CORPUS = [
+    "The meeting has been moved to Thursday afternoon",
+    "Please review the attached document before Friday",
+    "How long does it take to get to the airport?",
+    "Remember to water the plants while I am away",
+    "The results of the experiment were surprising",
+    "வணக்கம், எப்படி இருக்கிறீர்கள்?",
+    "கூட்டம் வியாழக்கிழமை மதியத்திற்கு மாற்றப்பட்டுள்ளது",
+    "Good morning - காலை வணக்கம்",
+    "தயவுசெய்து வெள்ளிக்கிழமைக்கு முன் ஆவணத்தை மதிப்பாய்வு செய்யவும்",
+    "நன்றி",
+    "Bonjour, comment allez-vous aujourd'hui?",
+    "Wo ist der nächste Bahnhof, bitte?",
+    "¿Dónde está la biblioteca de la ciudad?",
+    "नमस्ते, आप कैसे हैं?",
+    "Привет, как дела?",
+    "The weather forecast predicts rain tomorrow",
+    "சென்னை தமிழ்நாட்டின் தலைநகரம்",
+    "I will call you back in ten minutes",
+    "மொழிபெயர்ப்பு வெற்றிகரமாக சேமிக்கப்பட்டது",
+    "Our team won the championship last night",
+]
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Answers every request with a page shaped like Google Translate's mobile site."""
+
+    protocol_version = "HTTP/1.1"  # Allow keep-alive so pooled clients can reuse sockets
+    disable_nagle_algorithm = True  # Headers and body go out separately; avoid delayed-ACK stalls
+    delay = 0.0  # Simulated provider latency in seconds
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = '<html><body><div class="result-container">வணக்கம்</div></body></html>'.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in_server(delay=0.0):
+    """Start the stand-in provider on a free local port. Returns (server, base_url)."""
+    handler = type("StandInHandler", (_StandInHandler,), {"delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/m"
+
+
+def _time_calls(func, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name, samples):
+    print(f"{name:<28} mean {statistics.mean(samples) * 1000:7.3f} ms"
+          f"   median {statistics.median(samples) * 1000:7.3f} ms")
+
+
+def bench_connection_reuse(count=500):
+    """Compare a fresh connection per call (the old GoogleTranslator path) with the shared client."""
+    server, base_url = start_stand_in_server()
+
+    def construct_per_call():
+        # Mirrors GoogleTranslator(...).translate(), whose requests.get opens a new session each time
+        client = GoogleClient(base_url=base_url)
+        client.translate("hello")
+        client.close()
+
+    try:
+        per_call = _time_calls(construct_per_call, count)
+        client = GoogleClient(base_url=base_url)
+        pooled = _time_calls(lambda: client.translate("hello"), count)
+        client.close()
+    finally:
+        server.shutdown()
+
+    _report("construct per call", per_call)
+    _report("shared pooled client", pooled)
+    saved = statistics.mean(per_call) - statistics.mean(pooled)
+    print(f"overhead saved per request: {saved * 1000:.3f} ms")
+
+
+def bench_language_detection(rounds=1000):
+    """Count provider calls the local detector avoids on the sample corpus, and its cost."""
+    detected = Counter(detect_language(text) for text in SAMPLE_CORPUS)
+    avoided = detected["ta"]
+    explicit = sum(n for lang, n in detected.items() if lang not in ("ta", "auto"))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in SAMPLE_CORPUS:
+            detect_language(text)
+    per_call = (time.perf_counter() - start) / (rounds * len(SAMPLE_CORPUS))
+
+    print(f"corpus size:                {len(SAMPLE_CORPUS)}")
+    print(f"provider calls avoided:     {avoided} ({avoided / len(SAMPLE_CORPUS):.0%})")
+    print(f"calls with explicit source: {explicit}")
+    print(f"left to provider 'auto':    {detected['auto']}")
+    print(f"detection cost:             {per_call * 1e6:.1f} us per selection")
+    print("detected:", dict(detected.most_common()))
+
+
+def bench_chunked_translation(delay=0.3, sentences=60):
+    """Time a multi-chunk document against a single chunk with simulated provider latency."""
+    import provider
+    import translator
+
+    server, base_url = start_stand_in_server(delay)
+    provider._client = GoogleClient(base_url=base_url)
+    sentence = "The committee reviewed the proposal in detail and asked for several changes."
+    document = " ".join(f"{sentence[:-1]} number {i}." for i in range(sentences))
+    try:
+        start = time.perf_counter()
+        translator.translate_to_tamil(sentence)
+        single = time.perf_counter() - start
+        time.sleep(1)  # Let the rate limiter refill
+        start = time.perf_counter()
+        result = translator.translate_to_tamil(document)
+        whole = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    chunks = len(split_into_chunks(document))
+    print(f"simulated provider latency: {delay * 1000:.0f} ms")
+    print(f"single chunk:               {single * 1000:.0f} ms")
+    print(f"{len(document)} chars in {chunks} chunks: {whole * 1000:.0f} ms"
+          f" (sequential would be ~{chunks * delay * 1000:.0f} ms)")
+    print("translated:", result is not None)
+
+
+def _debounce_stress(schedule_job, bursts, changes, interval, delay):
+    """Fire `bursts` rounds of rapid selection changes; return (peak threads, firing latencies)."""
+    latencies = []
+    fired = threading.Event()
+    peak_threads = threading.active_count()
+
+    for _ in range(bursts):
+        fired.clear()
+        for _ in range(changes):
+            last = time.perf_counter()
+
+            def job(last=last):
+                latencies.append(time.perf_counter() - last - delay)
+                fired.set()
+
+            schedule_job(job)
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(interval)
+        fired.wait(delay * 5)
+    return peak_threads, latencies
+
+
+def bench_scheduler_stress(bursts=20, changes=200, interval=0.001, delay=0.05):
+    """Rapid selection changes: the old Timer-per-selection debounce against the shared scheduler."""
+    baseline = threading.active_count()
+
+    timer = None
+    started = {"threading.Timer": 0, "Scheduler": 1}
+
+    def timer_debounce(job):
+        nonlocal timer
+        if timer:
+            timer.cancel()
+        timer = threading.Timer(delay, job)
+        timer.start()
+        started["threading.Timer"] += 1
+
+    scheduler = Scheduler()
+    results = {
+        "threading.Timer": _debounce_stress(timer_debounce, bursts, changes, interval, delay),
+        "Scheduler": _debounce_stress(lambda job: scheduler.schedule(delay, job, key="translate"),
+                                      bursts, changes, interval, delay),
+    }
+    scheduler.stop()
+
+    print(f"{bursts} bursts x {changes} selection changes, {interval * 1000:.0f} ms apart,"
+          f" {delay * 1000:.0f} ms debounce; {baseline} threads before start")
+    for name, (peak, latencies) in results.items():
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else float("nan")
+        print(f"{name:<16} threads started {started[name]:5d}   peak alive {peak:3d}   fired {len(latencies):3d}"
+              f"   latency median {statistics.median(latencies) * 1000:6.2f} ms   p99 {p99 * 1000:6.2f} ms")
+
+
+BENCHMARKS = {
+    "chunked-translation": bench_chunked_translation,
+    "connection-reuse": bench_connection_reuse,
+    "language-detection": bench_language_detection,
+    "scheduler-stress": bench_scheduler_stress,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    args = parser.parse_args()
+    BENCHMARKS[args.name]()
+
+
+if __name__ == "__main__":
+    main()
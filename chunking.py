@@ -0,0 +1,65 @@
+import re
+
+CHUNK_CHARS = 1500  # Well under the provider's 5000 character limit, keeps each request fast
+
+SENTENCE_END = re.compile(r"(?<=[.!?।…])\s+")
+CLAUSE_END = re.compile(r"(?<=[,;:—–)])\s+")
+
+
+def _split_oversized(piece, limit):
+    """Break a piece longer than `limit` at clause boundaries, then whitespace, then anywhere."""
+    for pattern in (CLAUSE_END, re.compile(r"\s+")):
+        parts = pattern.split(piece)
+        if len(parts) > 1:
+            return _pack(parts, limit)
+    return [piece[i:i + limit] for i in range(0, len(piece), limit)]
+
+
+def _pack(parts, limit):
+    """Greedily join consecutive parts with spaces into chunks no longer than `limit`."""
+    chunks = []
+    current = ""
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+        if len(part) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_oversized(part, limit))
+        elif not current:
+            current = part
+        elif len(current) + 1 + len(part) <= limit:
+            current = f"{current} {part}"
+        else:
+            chunks.append(current)
+            current = part
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_into_chunks(text, limit=CHUNK_CHARS):
+    """Split text into (chunk, separator) pairs at sentence/clause boundaries.
+
+    Each chunk is at most `limit` characters. The separator (a newline between
+    paragraphs, otherwise a space) is what joins it to the next chunk when the
+    translations are stitched back together.
+    """
+    text = text.strip()
+    if len(text) <= limit:
+        return [(text, "")]
+
+    pairs = []
+    for paragraph in text.splitlines():
+        chunks = _pack(SENTENCE_END.split(paragraph), limit)
+        pairs.extend((chunk, " ") for chunk in chunks)
+        if pairs and chunks:
+            pairs[-1] = (pairs[-1][0], "\n")
+    return pairs
+
+
+def join_chunks(translated, pairs):
+    """Stitch translated chunks back together in order using the original separators."""
+    return "".join(t + sep for t, (_, sep) in zip(translated, pairs)).strip()
@@ -0,0 +1,262 @@
+import bisect
+import csv
+import glob
+import hashlib
+import os
+import re
+
+from translator import (HISTORY_FILE_BASE, HISTORY_FOLDER, HISTORY_LIMIT, HISTORY_SEGMENT_BYTES,
+                        get_history_files, history_lock, replace_history_runs)
+
+STEP_ROWS = 2000  # Rows read (or written) per step, bounding the I/O of each idle slice
+
+PHASE_IDLE = "idle"
+PHASE_SCAN = "scan"
+PHASE_WRITE = "write"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_entry(original, translated):
+    """Key under which two history rows count as duplicates (case and whitespace insensitive)."""
+    key = f"{_WHITESPACE.sub(' ', original).strip().lower()}\x00{_WHITESPACE.sub(' ', translated).strip().lower()}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _history_state():
+    """Paths and signatures of every segment; unchanged state means there is nothing new to compact."""
+    return tuple((path, _signature(path)) for path in get_history_files())
+
+
+class HistoryCompactor:
+    """Incrementally drops duplicate history entries and merges small rotated files.
+
+    A run is split into bounded steps so it can be driven from idle time. A
+    read-only scan pass records where each entry last occurs, which marks the
+    segments holding older copies. Only runs of consecutive segments that lost
+    rows, or small segments that can be packed into fewer files, are rewritten;
+    they keep their own IDs, so untouched segments are never renumbered. The
+    active segment is only read, never rewritten. Readers keep seeing the old
+    files until the swap; if history is rewritten in the meantime (e.g. by the
+    editor) the run starts over. A run that finds nothing to do writes nothing,
+    and no run starts at all until history changes after the last one.
+    """
+
+    def __init__(self, step_rows=STEP_ROWS):
+        self.step_rows = step_rows
+        self.last_result = None  # (rows kept, rows removed) of the last completed run
+        self.watermark = None  # History state at the end of the last completed run
+        self.reset()
+
+    def reset(self):
+        self.phase = PHASE_IDLE
+        self.files = []
+        self.signatures = {}
+        self.ends = {}       # path -> byte offset the scan stopped at
+        self.file_index = 0
+        self.offset = 0
+        self.seq = 0
+        self.starts = []     # sequence number of the first row of each file
+        self.last_seen = {}  # entry key -> sequence number of its most recent row
+        self.dirty = set()   # indexes of files holding an older copy of some entry
+        self.runs = []       # [[file index, ...]] consecutive segments to rewrite
+        self.queue = []      # file indexes still to copy in the write phase
+        self.outputs = []    # per run: [[path, rows, bytes], ...] temporary output segments
+        self.run_of = {}     # file index -> index into self.runs
+        self.temp_count = 0
+        self.removed = 0
+
+    # ───────────────────────────── stepping ─────────────────────────────
+    def step(self):
+        """Do one bounded slice of work. Returns True while a run is still in progress."""
+        try:
+            if self.phase == PHASE_IDLE:
+                return self._begin()
+            if self.phase == PHASE_SCAN:
+                self._scan_step()
+            elif self.phase == PHASE_WRITE:
+                self._write_step()
+            return self.phase != PHASE_IDLE
+        except Exception:
+            self._discard()
+            return False
+
+    def _begin(self):
+        # Output of a run cut short (e.g. the app quit mid-way) must not leak into this one
+        for stray in glob.glob(os.path.join(HISTORY_FOLDER, f".{HISTORY_FILE_BASE}.compact_*.tmp")):
+            os.remove(stray)
+        state = _history_state()
+        if not state or state == self.watermark:
+            return False
+        self.files = [path for path, _ in state]
+        self.signatures = dict(state)
+        self.phase = PHASE_SCAN
+        return True
+
+    def _read_rows(self, limit):
+        """Read up to `limit` rows from the current file, advancing through the file list."""
+        path = self.files[self.file_index]
+        end = self.ends.get(path)
+        rows = []
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            file.seek(self.offset)
+            # readline keeps tell() usable, unlike iterating over the file
+            reader = csv.reader(iter(file.readline, ""))
+            while len(rows) < limit and (end is None or file.tell() < end):
+                row = next(reader, None)
+                if row is None:
+                    break
+                rows.append(row)
+            self.offset = file.tell()
+            finished = len(rows) < limit or (end is not None and self.offset >= end)
+        if finished:
+            self.ends[path] = self.offset
+            self.file_index += 1
+            self.offset = 0
+        return rows
+
+    def _scan_step(self):
+        if len(self.starts) == self.file_index:
+            self.starts.append(self.seq)
+        for row in self._read_rows(self.step_rows):
+            if len(row) >= 2:
+                key = normalize_entry(row[0], row[1])
+                previous = self.last_seen.get(key)
+                if previous is not None:
+                    self.dirty.add(bisect.bisect_right(self.starts, previous) - 1)
+                self.last_seen[key] = self.seq
+            self.seq += 1
+        if self.file_index >= len(self.files):
+            self.starts.append(self.seq)
+            self._plan()
+
+    # ───────────────────────────── planning ─────────────────────────────
+    def _file_rows(self, index):
+        return self.starts[index + 1] - self.starts[index]
+
+    def _is_small(self, index):
+        return (self._file_rows(index) < HISTORY_LIMIT
+                and self.signatures[self.files[index]][0] < HISTORY_SEGMENT_BYTES)
+
+    def _mergeable(self, run):
+        """True if a run of small segments fits in fewer files."""
+        rows = sum(self._file_rows(i) for i in run)
+        size = sum(self.signatures[self.files[i]][0] for i in run)
+        spare = len(run) - 1
+        return spare > 0 and rows <= HISTORY_LIMIT * spare and size <= HISTORY_SEGMENT_BYTES * spare
+
+    def _plan(self):
+        """Pick the runs of consecutive non-active segments worth rewriting."""
+        runs, run = [], []
+        for index in range(len(self.files) - 1):
+            if index in self.dirty or self._is_small(index):
+                run.append(index)
+            elif run:
+                runs.append(run)
+                run = []
+        if run:
+            runs.append(run)
+        self.runs = [r for r in runs if any(i in self.dirty for i in r) or self._mergeable(r)]
+
+        if not self.runs:
+            self._finish()
+            return
+        self.queue = [index for run in self.runs for index in run]
+        self.run_of = {index: n for n, run in enumerate(self.runs) for index in run}
+        self.outputs = [[] for _ in self.runs]
+        self.phase = PHASE_WRITE
+        self.file_index = self.queue[0]
+        self.offset = 0
+
+    # ───────────────────────────── writing ─────────────────────────────
+    def _write_step(self):
+        index = self.queue[0]
+        self.file_index = index
+        if self.offset == 0:
+            self.seq = self.starts[index]
+        rows = []
+        for row in self._read_rows(self.step_rows):
+            if len(row) >= 2 and self.last_seen.get(normalize_entry(row[0], row[1])) == self.seq:
+                rows.append(row[:2])
+            else:
+                self.removed += 1
+            self.seq += 1
+        self._write_out(self.outputs[self.run_of[index]], rows)
+        if self.file_index != index:
+            self.queue.pop(0)
+            if not self.queue:
+                self._swap()
+
+    def _write_out(self, outputs, rows):
+        """Append rows to a run's temporary output segments, rotating by the same row/byte limits as history."""
+        file = None
+        try:
+            for row in rows:
+                current = outputs[-1] if outputs else None
+                mode = "a"  # Keep filling the segment an earlier step started
+                if current is None or current[1] >= HISTORY_LIMIT or current[2] >= HISTORY_SEGMENT_BYTES:
+                    if file is not None:
+                        file.close()
+                        file = None
+                    self.temp_count += 1
+                    path = os.path.join(HISTORY_FOLDER, f".{HISTORY_FILE_BASE}.compact_{self.temp_count}.tmp")
+                    current = [path, 0, 0]
+                    outputs.append(current)
+                    mode = "w"
+                if file is None:
+                    file = open(current[0], mode, newline="", encoding="utf-8")
+                    writer = csv.writer(file)
+                writer.writerow(row)
+                current[1] += 1
+                current[2] = file.tell()
+        finally:
+            if file is not None:
+                file.close()
+
+    # ───────────────────────────── swap ─────────────────────────────────
+    def _swap(self):
+        with history_lock:
+            files = get_history_files()
+            rewritten = [self.files[i] for run in self.runs for i in run]
+            unchanged = files[:len(self.files)] == self.files and all(
+                _signature(f) == self.signatures[f] for f in rewritten
+            )
+            if not unchanged:
+                # History was rewritten while we worked; try again next time
+                self._discard()
+                return
+
+            # Each run is packed into at most as many files as it had, reusing their IDs
+            runs = [([self.files[i] for i in run], [tuple(out) for out in outputs])
+                    for run, outputs in zip(self.runs, self.outputs)]
+            if not replace_history_runs(runs):
+                # Another process (e.g. an import) changed the segments
+                self._discard()
+                return
+            self.outputs = []
+        self._finish()
+
+    def _finish(self):
+        self.last_result = (self.starts[-1] - self.removed, self.removed)
+        self.watermark = _history_state()
+        self.reset()
+
+    def _discard(self):
+        for outputs in self.outputs:
+            for tmp, _, _ in outputs:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        self.reset()
+
+
+def compact_history(step_rows=STEP_ROWS):
+    """Run a full compaction in the foreground. Returns (rows kept, rows removed)."""
+    compactor = HistoryCompactor(step_rows)
+    while compactor.step():
+        pass
+    return compactor.last_result or (0, 0)
@@ -1,24 +1,87 @@
 import tkinter as tk
+import tkinter.font as tkfont
+from collections import OrderedDict
 from tkinter import messagebox
 import pyautogui
-import os
 
 PINK_BG = "#ffe6f0"
 PINK_LIGHT = "#fff0f5"
 BUTTON_PINK = "#ffb6c1"
 BUTTON_PINK_DARK = "#fcb5c0"
 
-def show_translation_popup(translated_text):
-    popup = tk.Tk()
+POPUP_FONT = ("Arial", 11)
+POPUP_WRAP = 300
+POPUP_PAD = 10
+POPUP_DURATION = 4000  # ms
+POPUP_MAX_CHARS = 300  # Longer translations are cut short in the popup; the full text is in Recent and history
+LAYOUT_CACHE_SIZE = 256  # Measured (text, font, wrap width) layouts kept around
+
+_fonts = {}  # (interpreter, font spec) -> tkfont.Font
+_measurers = {}  # interpreter -> hidden Label used for measuring
+_layouts = OrderedDict()  # (interpreter, text, font spec, wrap width) -> (width, height), least recently used first
+
+def get_font(master, spec):
+    """Return the shared Font for a (family, size[, weight]) spec, created once per Tk interpreter."""
+    key = (id(master.tk), spec)
+    font = _fonts.get(key)
+    if font is None:
+        family, size, *rest = spec
+        font = tkfont.Font(root=master, family=family, size=size, weight=rest[0] if rest else "normal")
+        _fonts[key] = font
+    return font
+
+def measure_text(master, text, spec=POPUP_FONT, wraplength=POPUP_WRAP):
+    """Requested (width, height) of a wrapped Label showing `text`, cached by (text, font, wrap width).
+
+    Must run on the Tk thread. Shaping long Tamil strings is slow, so each
+    layout is measured once on a hidden, never-mapped Label and then reused.
+    """
+    key = (id(master.tk), text, spec, wraplength)
+    size = _layouts.get(key)
+    if size is not None:
+        _layouts.move_to_end(key)
+        return size
+
+    measurer = _measurers.get(id(master.tk))
+    if measurer is None:
+        measurer = tk.Label(master._root(), justify='left')
+        _measurers[id(master.tk)] = measurer
+    measurer.configure(text=text, font=get_font(master, spec), wraplength=wraplength)
+    size = (measurer.winfo_reqwidth(), measurer.winfo_reqheight())
+
+    _layouts[key] = size
+    if len(_layouts) > LAYOUT_CACHE_SIZE:
+        _layouts.popitem(last=False)
+    return size
+
+def popup_text(translated_text):
+    """Text shown in the popup: long translations are truncated so the window stays on screen."""
+    if len(translated_text) <= POPUP_MAX_CHARS:
+        return translated_text
+    return translated_text[:POPUP_MAX_CHARS].rstrip() + "…"
+
+def prepare_popup(master, translated_text):
+    """Measure a popup's layout ahead of time, e.g. while history is being saved."""
+    measure_text(master, popup_text(translated_text))
+
+def show_translation_popup(translated_text, master):
+    """Show a short-lived popup near the mouse. Must run on the Tk thread of `master`."""
+    popup = tk.Toplevel(master)
+    popup.withdraw()  # Size and place everything before the window is first mapped
     popup.overrideredirect(True)
     popup.attributes('-topmost', True)
     popup.configure(bg=PINK_BG)
+
+    text = popup_text(translated_text)
+    width, height = measure_text(master, text)
+    label = tk.Label(popup, text=text, font=get_font(master, POPUP_FONT), bg=PINK_BG,
+                     wraplength=POPUP_WRAP, justify='left')
+    label.pack(padx=POPUP_PAD, pady=POPUP_PAD)
+
     x, y = pyautogui.position()
-    popup.geometry(f"+{x + 20}+{y + 20}")
-    label = tk.Label(popup, text=translated_text, font=("Arial", 11), bg=PINK_BG, wraplength=300, justify='left')
-    label.pack(padx=10, pady=10)
-    popup.after(4000, popup.destroy)
-    popup.mainloop()
+    popup.geometry(f"{width + 2 * POPUP_PAD}x{height + 2 * POPUP_PAD}+{x + 20}+{y + 20}")
+    popup.deiconify()
+    popup.after(POPUP_DURATION, popup.destroy)
 
 def show_history_window(load_history_func):
     history = load_history_func()
@@ -42,10 +105,8 @@ def show_history_window(load_history_func):
 
     def confirm_and_clear():
         if messagebox.askyesno("Confirm", "Do you really want to delete all history?"):
-            from translator import get_history_files
-            for f in get_history_files():
-                if os.path.exists(f):
-                    os.remove(f)
+            from translator import clear_all_history
+            clear_all_history()
             messagebox.showinfo("Deleted", "All history deleted successfully.")
             win.destroy()
 
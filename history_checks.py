@@ -0,0 +1,190 @@
+"""Regression checks for history storage: migration, rotation, cross-process sync and compaction.
+
+Run with ``python history_checks.py [name ...]``; everything happens in temporary folders and the
+exit status is non-zero if any check fails.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import traceback
+
+from segments import SegmentManager
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASE = "translation_history"
+
+
+def _write(folder, name, rows):
+    with open(os.path.join(folder, name), "w", encoding="utf-8", newline="") as file:
+        for original, translated in rows:
+            file.write(f"{original},{translated}\r\n")
+
+
+def _rows(manager):
+    rows = []
+    for path in manager.paths():
+        with open(path, encoding="utf-8") as file:
+            rows.extend(line.rstrip("\r\n").split(",") for line in file)
+    return rows
+
+
+def _expect(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+# ───────────────────────────── segments ─────────────────────────────
+def check_migration(folder):
+    """Legacy names are migrated in numeric order; a padded twin is never overwritten."""
+    _write(folder, f"{BASE}_1.csv", [("one", "1")])
+    _write(folder, f"{BASE}_2.csv", [("old", "row")])
+    _write(folder, f"{BASE}_10.csv", [("ten", "10")])
+    _write(folder, f"{BASE}_000002.csv", [("new", "a"), ("new", "b")])
+
+    manager = SegmentManager(folder, BASE, 500, 1 << 20)
+    ids = [seg["id"] for seg in manager.segments]
+    _expect(len(ids) == len(set(ids)), f"duplicate segment IDs {ids}")
+    rows = sorted(map(tuple, _rows(manager)))
+    _expect(rows == sorted([("one", "1"), ("old", "row"), ("ten", "10"), ("new", "a"), ("new", "b")]),
+            f"rows lost or duplicated: {rows}")
+    _expect(_rows(manager)[:3] == [["one", "1"], ["new", "a"], ["new", "b"]], "segments out of order")
+    _expect(not any(name.endswith("_2.csv") or name.endswith("_10.csv") for name in os.listdir(folder)),
+            "legacy names left behind")
+
+
+def check_rotation(folder):
+    """Segments rotate by rows and by bytes; counts survive a restart without recounting."""
+    manager = SegmentManager(folder, BASE, 5, 1 << 20)
+    manager.append((f"row {i}", "x") for i in range(12))
+    _expect([seg["rows"] for seg in manager.segments] == [5, 5, 2], f"row rotation: {manager.segments}")
+
+    manager.append([("y" * 300, "z")])
+    by_bytes = SegmentManager(folder, BASE, 500, 200)
+    by_bytes.append([("a", "b"), ("c", "d")])
+    _expect(by_bytes.segments[-1]["rows"] == 2 and by_bytes.segments[-2]["rows"] == 3,
+            f"byte rotation: {by_bytes.segments}")
+
+    by_bytes.save_counts()
+    reopened = SegmentManager.__new__(SegmentManager)
+    reopened._measure = None  # Calling it would mean the active segment was recounted
+    reopened.__init__(folder, BASE, 500, 200)
+    _expect(reopened.segments == by_bytes.segments, "manifest counts differ after save_counts")
+
+
+def check_cross_process(folder):
+    """Segments another process adds are picked up, and their IDs are never reused."""
+    manager = SegmentManager(folder, BASE, 5, 1 << 20)
+    manager.append((f"app {i}", "x") for i in range(3))
+
+    script = (f"import sys; sys.path.insert(0, {HERE!r}); from segments import SegmentManager; "
+              f"SegmentManager({folder!r}, {BASE!r}, 5, 1 << 20).append((f'import {{i}}', 'y') for i in range(12))")
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+    manager.append((f"late {i}", "z") for i in range(6))
+    rows = _rows(manager)
+    _expect(len(rows) == 21, f"expected 21 visible rows, got {len(rows)}")
+    fresh = SegmentManager(folder, BASE, 5, 1 << 20)
+    _expect(_rows(fresh) == rows, "a fresh manager sees different history")
+    ids = [seg["id"] for seg in fresh.segments]
+    _expect(ids == sorted(set(ids)), f"segment IDs reused or out of order: {ids}")
+    _expect(not os.path.exists(os.path.join(folder, "manifest.lock")), "lock file left behind")
+
+
+# ───────────────────────────── compaction ─────────────────────────────
+def check_compaction(folder):
+    """Duplicates keep their latest copy, unchanged history is left alone, interrupted runs leave no trace."""
+    os.chdir(folder)  # translator keeps history relative to the working directory
+    import translator
+    from compaction import HistoryCompactor, compact_history
+
+    def ids():
+        return [os.path.basename(path) for path in translator.get_history_files()]
+
+    translator.append_history_rows((f"row {i}", f"t {i}") for i in range(1500))
+    before = ids()
+    mtimes = [os.stat(path).st_mtime_ns for path in translator.get_history_files()]
+    _expect(compact_history() == (1500, 0), "unique history should keep every row")
+    _expect(ids() == before and [os.stat(p).st_mtime_ns for p in translator.get_history_files()] == mtimes,
+            "a run with nothing to remove rewrote segments")
+
+    compactor = HistoryCompactor()
+    while compactor.step():
+        pass
+    compactor.step()
+    _expect(compactor.phase == "idle", "a second run started although history did not change")
+
+    translator.append_history_rows([("ROW 10", "t 10")])
+    while compactor.step():
+        pass
+    rows = translator.load_history()
+    _expect(compactor.last_result == (1500, 1), f"unexpected result {compactor.last_result}")
+    _expect([r for r in rows if r[0].lower() == "row 10"] == [["ROW 10", "t 10"]], "latest copy not kept")
+    _expect(ids()[:len(before)] == before, "untouched segments were renumbered")
+
+    # Small segments are merged into fewer files
+    translator.rewrite_history([])
+    for k in range(4):
+        translator.append_history_rows((f"small {k} {i}", "s") for i in range(50))
+        translator.get_new_history_file()
+    translator.append_history_rows([("active", "a")])
+    compact_history()
+    _expect(len(ids()) == 2 and len(translator.load_history()) == 201, f"small segments not merged: {ids()}")
+
+    # An interrupted run must not leak rows into the next one
+    translator.rewrite_history([(f"row {i}", f"t {i}") for i in range(1200)] + [("row 0", "t 0")])
+    compactor = HistoryCompactor(step_rows=100)
+    while compactor.phase != "write":
+        compactor.step()
+    compactor.step()
+    translator.rewrite_history([("only", "row")])
+    _expect(compact_history() == (1, 0) and translator.load_history() == [["only", "row"]],
+            "leftovers of an interrupted run came back")
+
+    # History rewritten mid-run (e.g. by the editor) discards the run
+    translator.rewrite_history([(f"row {i}", f"t {i}") for i in range(1200)] + [("row 0", "t 0")])
+    compactor = HistoryCompactor(step_rows=100)
+    while compactor.phase != "write":
+        compactor.step()
+    translator.rewrite_history([("edited", "row")])
+    while compactor.step():
+        pass
+    _expect(translator.load_history() == [["edited", "row"]], "a stale run overwrote an edit")
+    _expect(not [n for n in os.listdir(translator.HISTORY_FOLDER) if n.endswith(".tmp")], "temp files left behind")
+
+
+CHECKS = {
+    "migration": check_migration,
+    "rotation": check_rotation,
+    "cross-process": check_cross_process,
+    "compaction": check_compaction,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"checks to run (default: all of {', '.join(CHECKS)})")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in CHECKS]
+    if unknown:
+        parser.error(f"unknown check(s): {', '.join(unknown)}")
+
+    cwd = os.getcwd()
+    failed = 0
+    for name in args.names or CHECKS:
+        with tempfile.TemporaryDirectory(prefix="history-check-") as folder:
+            try:
+                CHECKS[name](folder)
+                print(f"ok    {name}")
+            except Exception:
+                failed += 1
+                print(f"FAIL  {name}")
+                traceback.print_exc()
+            finally:
+                os.chdir(cwd)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
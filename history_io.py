@@ -0,0 +1,202 @@
+"""Streaming export and import of translation history (CSV, JSONL and TMX).
+
+Usage: ``python history_io.py export history.tmx`` or ``python history_io.py import history.jsonl``.
+The format is taken from the file extension unless ``--format`` is given.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from xml.sax.saxutils import escape, quoteattr
+
+from translator import append_history_rows, iter_history
+
+FORMATS = ("csv", "jsonl", "tmx")
+SOURCE_LANG = "en"
+TARGET_LANG = "ta"
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+INDEX_CACHE_KIB = 2048  # Page cache of the on-disk dedup index; the rest of it stays on disk
+
+# Characters XML 1.0 does not allow at all, not even escaped
+_XML_INVALID = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+def _valid_rows(rows):
+    for row in rows:
+        if len(row) >= 2 and row[0] and row[1]:
+            yield row[0], row[1]
+
+
+def _row_key(original, translated):
+    """Compact key for deduplication, normalised the same way as is_duplicate_translation."""
+    key = f"{original.lower().strip()}\x00{translated.lower().strip()}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+
+
+def guess_format(path):
+    """Infer the export format from a file name."""
+    fmt = path.rsplit(".", 1)[-1].lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown history format '{fmt}', expected one of: {', '.join(FORMATS)}")
+    return fmt
+
+
+# ───────────────────────────── writers ─────────────────────────────
+def _write_csv(file, rows):
+    writer = csv.writer(file)
+    for row in rows:
+        writer.writerow(row)
+
+
+def _write_jsonl(file, rows):
+    for original, translated in rows:
+        file.write(json.dumps({"original": original, "translated": translated}, ensure_ascii=False))
+        file.write("\n")
+
+
+def _xml_text(text):
+    """Escape text for XML; Word's manual line breaks become newlines, other control characters are dropped."""
+    text = text.replace("\x0b", "\n").replace("\x0c", "\n")
+    return escape(_XML_INVALID.sub("", text))
+
+
+def _write_tmx(file, rows):
+    file.write('<?xml version="1.0" encoding="UTF-8"?>\n<tmx version="1.4">\n')
+    file.write(f'  <header creationtool="Tamil-Translator" creationtoolversion="1.0" segtype="sentence"'
+               f' o-tmf="csv" adminlang="en" srclang={quoteattr(SOURCE_LANG)} datatype="plaintext"/>\n')
+    file.write("  <body>\n")
+    for original, translated in rows:
+        file.write(f'    <tu>\n'
+                   f'      <tuv xml:lang="{SOURCE_LANG}"><seg>{_xml_text(original)}</seg></tuv>\n'
+                   f'      <tuv xml:lang="{TARGET_LANG}"><seg>{_xml_text(translated)}</seg></tuv>\n'
+                   f'    </tu>\n')
+    file.write("  </body>\n</tmx>\n")
+
+
+# ───────────────────────────── readers ─────────────────────────────
+def _read_csv(file):
+    yield from _valid_rows(csv.reader(file))
+
+
+def _read_jsonl(file):
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        entry = json.loads(line)
+        yield entry.get("original", ""), entry.get("translated", "")
+
+
+def _read_tmx(file):
+    """Yield (source, target) pairs, discarding each <tu> once read so memory stays flat."""
+    parents = []  # Open elements; the parser would otherwise keep every <tu> under <body>
+    for event, elem in ET.iterparse(file, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+        parents.pop()
+        if elem.tag != "tu":
+            continue
+        segs = {}
+        for tuv in elem.iter("tuv"):
+            seg = tuv.find("seg")
+            segs[tuv.get(XML_LANG, tuv.get("lang", ""))] = "".join(seg.itertext()) if seg is not None else ""
+        translated = segs.pop(TARGET_LANG, "")
+        original = segs.get(SOURCE_LANG) or next(iter(segs.values()), "")
+        yield original, translated
+        elem.clear()
+        if parents:
+            parents[-1].remove(elem)
+
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "tmx": _write_tmx}
+READERS = {"csv": _read_csv, "jsonl": _read_jsonl, "tmx": _read_tmx}
+
+
+def iter_file(path, fmt=None):
+    """Stream (original, translated) rows from an exported history file."""
+    fmt = fmt or guess_format(path)
+    if fmt == "tmx":
+        with open(path, "rb") as file:
+            yield from _valid_rows(READERS[fmt](file))
+    else:
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            yield from _valid_rows(READERS[fmt](file))
+
+
+def export_history(path, fmt=None):
+    """Stream the whole history into `path`. Returns the number of rows written."""
+    fmt = fmt or guess_format(path)
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in _valid_rows(iter_history()):
+            count += 1
+            yield row
+
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        WRITERS[fmt](file, counted())
+    return count
+
+
+@contextmanager
+def _digest_index():
+    """Temporary on-disk set of row digests, so dedup memory doesn't grow with history size."""
+    fd, path = tempfile.mkstemp(prefix="history-import-", suffix=".sqlite")
+    os.close(fd)
+    db = sqlite3.connect(path)
+    try:
+        db.execute(f"PRAGMA cache_size=-{INDEX_CACHE_KIB}")
+        db.execute("PRAGMA journal_mode=OFF")
+        db.execute("PRAGMA synchronous=OFF")
+        db.execute("CREATE TABLE seen (key BLOB PRIMARY KEY) WITHOUT ROWID")
+        yield db
+    finally:
+        db.close()
+        os.remove(path)
+
+
+def import_history(path, fmt=None):
+    """Bulk-load rows from `path`, skipping any already in history. Returns (imported, skipped)."""
+    skipped = 0
+
+    with _digest_index() as index:
+        index.executemany("INSERT OR IGNORE INTO seen VALUES (?)",
+                          ((_row_key(original, translated),) for original, translated in _valid_rows(iter_history())))
+
+        def new_rows():
+            nonlocal skipped
+            for original, translated in iter_file(path, fmt):
+                cursor = index.execute("INSERT OR IGNORE INTO seen VALUES (?)", (_row_key(original, translated),))
+                if cursor.rowcount == 0:
+                    skipped += 1
+                    continue
+                yield original, translated
+
+        imported = append_history_rows(new_rows())
+    return imported, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=("export", "import"))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    args = parser.parse_args()
+
+    if args.action == "export":
+        print(f"Exported {export_history(args.path, args.format)} entries to {args.path}")
+    else:
+        imported, skipped = import_history(args.path, args.format)
+        print(f"Imported {imported} entries from {args.path} ({skipped} duplicates skipped)")
+
+
+if __name__ == "__main__":
+    main()
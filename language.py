@@ -0,0 +1,134 @@
+import math
+import re
+from collections import Counter
+
+# Unicode blocks of the scripts we recognise (named by their main Google language code)
+SCRIPT_BLOCKS = [
+    ("ta", 0x0B80, 0x0BFF),     # Tamil
+    ("hi", 0x0900, 0x097F),     # Devanagari
+    ("bn", 0x0980, 0x09FF),     # Bengali
+    ("te", 0x0C00, 0x0C7F),     # Telugu
+    ("kn", 0x0C80, 0x0CFF),     # Kannada
+    ("ml", 0x0D00, 0x0D7F),     # Malayalam
+    ("si", 0x0D80, 0x0DFF),     # Sinhala
+    ("ar", 0x0600, 0x06FF),     # Arabic
+    ("ru", 0x0400, 0x04FF),     # Cyrillic
+    ("el", 0x0370, 0x03FF),     # Greek
+    ("th", 0x0E00, 0x0E7F),     # Thai
+    ("ko", 0xAC00, 0xD7AF),     # Hangul
+    ("ja", 0x3040, 0x30FF),     # Hiragana and Katakana
+    ("zh-CN", 0x4E00, 0x9FFF),  # CJK ideographs
+]
+
+# Scripts written by essentially one language, so the script alone names it. Devanagari,
+# Arabic, Cyrillic, Bengali and CJK are shared (Marathi, Urdu, Ukrainian, Assamese,
+# Japanese kanji...) and are left to the provider's auto detection.
+SINGLE_LANGUAGE_SCRIPTS = {"ta", "te", "kn", "ml", "si", "el", "th", "ko", "ja"}
+
+# The trigram samples are too small to tell related Latin languages apart reliably
+# (Swedish scores as Dutch, Catalan as French), so only English is ever sent explicitly
+CONFIDENT_LATIN = {"en"}
+
+SCRIPT_THRESHOLD = 0.5     # Share of letters a script needs before we trust it
+MIN_NGRAM_LETTERS = 12     # Shorter Latin text is left to the provider's auto detection
+NGRAM_MIN_SCORE = 0.2      # Cosine similarity the best language needs at all
+NGRAM_MARGIN = 0.1         # Best language must also beat the runner-up by this much
+
+# Small training samples for the Latin-script trigram model
+LATIN_SAMPLES = {
+    "en": "The quick brown fox jumps over the lazy dog. This is the one thing that we have "
+          "to do with all of them, and there will be more work for you when they come "
+          "back from the office. What would you like to read about in the history of the world?",
+    "fr": "Le renard brun rapide saute par-dessus le chien paresseux. C'est la seule chose que "
+          "nous devons faire avec eux, et il y aura plus de travail pour vous quand ils "
+          "reviendront du bureau. Qu'est-ce que vous voulez lire dans l'histoire du monde?",
+    "de": "Der schnelle braune Fuchs springt über den faulen Hund. Das ist die einzige Sache, "
+          "die wir mit ihnen machen müssen, und es wird mehr Arbeit für dich geben, wenn sie "
+          "aus dem Büro zurückkommen. Worüber möchtest du in der Geschichte der Welt lesen?",
+    "es": "El rápido zorro marrón salta sobre el perro perezoso. Esta es la única cosa que "
+          "tenemos que hacer con todos ellos, y habrá más trabajo para usted cuando vuelvan "
+          "de la oficina. ¿Qué le gustaría leer sobre la historia del mundo?",
+    "it": "La veloce volpe marrone salta sopra il cane pigro. Questa è l'unica cosa che "
+          "dobbiamo fare con tutti loro, e ci sarà più lavoro per te quando torneranno "
+          "dall'ufficio. Che cosa vorresti leggere sulla storia del mondo?",
+    "pt": "A rápida raposa marrom pula sobre o cão preguiçoso. Esta é a única coisa que "
+          "temos que fazer com todos eles, e haverá mais trabalho para você quando eles "
+          "voltarem do escritório. O que você gostaria de ler sobre a história do mundo?",
+    "nl": "De snelle bruine vos springt over de luie hond. Dit is het enige dat we met hen "
+          "moeten doen, en er zal meer werk voor je zijn wanneer ze terugkomen van het "
+          "kantoor. Waarover zou je willen lezen in de geschiedenis van de wereld?",
+}
+
+
+def _trigrams(text):
+    """Character trigram counts over lower-cased words padded with spaces."""
+    counts = Counter()
+    for word in re.findall(r"[^\W\d_]+", text.lower()):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            counts[padded[i:i + 3]] += 1
+    return counts
+
+
+def _normalise(counts):
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {k: v / norm for k, v in counts.items()}
+
+
+_PROFILES = {lang: _normalise(_trigrams(sample)) for lang, sample in LATIN_SAMPLES.items()}
+
+
+def script_ratios(text):
+    """Return the share of letters in `text` belonging to each known script (plus 'latin')."""
+    counts = Counter()
+    letters = 0
+    for ch in text:
+        if not ch.isalpha() and not 0x0900 <= ord(ch) <= 0x0DFF:
+            continue  # Indic vowel signs are marks, not letters, but still tell us the script
+        letters += 1
+        code = ord(ch)
+        if code < 0x0250:
+            counts["latin"] += 1
+            continue
+        for lang, start, end in SCRIPT_BLOCKS:
+            if start <= code <= end:
+                counts[lang] += 1
+                break
+    if not letters:
+        return {}
+    return {script: n / letters for script, n in counts.items()}
+
+
+def _detect_latin(text):
+    counts = _trigrams(text)
+    if sum(counts.values()) < MIN_NGRAM_LETTERS:
+        return "auto"
+    vector = _normalise(counts)
+    scores = sorted(
+        ((sum(w * profile.get(g, 0.0) for g, w in vector.items()), lang) for lang, profile in _PROFILES.items()),
+        reverse=True,
+    )
+    (best, lang), (runner_up, _) = scores[0], scores[1]
+    if lang not in CONFIDENT_LATIN or best < NGRAM_MIN_SCORE or best - runner_up < NGRAM_MARGIN:
+        return "auto"
+    return lang
+
+
+def detect_language(text):
+    """Guess the language of `text` locally. Returns a Google language code, or 'auto' if unsure."""
+    ratios = script_ratios(text)
+    if not ratios:
+        return "auto"
+    script, share = max(ratios.items(), key=lambda item: item[1])
+    if share < SCRIPT_THRESHOLD:
+        return "auto"
+    if script == "latin":
+        return _detect_latin(text)
+    if script == "zh-CN" and "ja" in ratios:
+        return "ja"  # Kanji-heavy Japanese still has some kana
+    return script if script in SINGLE_LANGUAGE_SCRIPTS else "auto"
+
+
+def is_tamil(text):
+    """Check if the text is already (mostly) Tamil."""
+    return detect_language(text) == "ta"
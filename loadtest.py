@@ -0,0 +1,297 @@
+"""Replay-based end-to-end load test for the auto-translate loop.
+
+Drives the real App pipeline (_auto_loop -> _should_translate_selection -> _delayed_translate ->
+translate_to_tamil -> save_history -> popup) without a desktop: selections are replayed from a
+trace, the provider is a stub with configurable latency, and the Tk window is replaced by a
+headless stand-in. History is written to a temporary folder.
+
+Usage: ``python loadtest.py [--trace trace.jsonl] [--latency 0.2] [--seed-history 5000]``.
+A trace is JSONL with one ``{"t": seconds, "text": "..."}`` per line; each selection stays
+active until the next entry (use an empty text to deselect).
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+
+STUB_PREFIX = "[ta] "
+
+SAMPLE_SENTENCES = [
+    "The meeting has been moved to Thursday",
+    "Please review the attached document before Friday",
+    "How long does it take to get to the airport",
+    "Remember to water the plants while I am away",
+    "The results of the experiment were surprising",
+    "The weather forecast predicts rain tomorrow",
+    "I will call you back in ten minutes",
+    "Our team won the championship last night",
+    "The market is busy during the festival",
+    "We planted new trees in the garden",
+    "The train to the city leaves every half hour",
+    "We need more volunteers for the weekend event",
+]
+
+
+def generate_trace(count=40, hold=1.6, gap=0.3, repeat_ratio=0.2, seed=1):
+    """Build a synthetic trace of `count` selections held for `hold` seconds, with occasional repeats."""
+    rng = random.Random(seed)
+    trace = []
+    t = 0.0
+    used = []
+    for i in range(count):
+        if used and rng.random() < repeat_ratio:
+            text = rng.choice(used)
+        else:
+            text = f"{rng.choice(SAMPLE_SENTENCES)} (item {i})"
+            used.append(text)
+        trace.append((t, text))
+        t += hold
+        if gap:
+            trace.append((t, ""))
+            t += gap
+    trace.append((t, ""))
+    return trace
+
+
+def load_trace(path):
+    """Read a recorded JSONL trace into a sorted list of (offset, text)."""
+    trace = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                trace.append((float(entry["t"]), entry.get("text", "")))
+    trace.sort(key=lambda item: item[0])
+    return trace
+
+
+class ReplaySource:
+    """Fake selection source: returns whatever the trace says is selected right now."""
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.offsets = [t for t, _ in trace]
+        self.start = None
+
+    def begin(self):
+        self.start = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def selection_started(self, text, before):
+        """Offset at which `text` most recently became the selection, no later than `before`."""
+        for t, sel in reversed(self.trace[:bisect.bisect_right(self.offsets, before)]):
+            if sel == text:
+                return t
+        return None
+
+    def get_selected_text(self):
+        i = bisect.bisect_right(self.offsets, self.elapsed()) - 1
+        return self.trace[i][1].strip() if i >= 0 else ""
+
+    @property
+    def duration(self):
+        return self.offsets[-1] if self.offsets else 0.0
+
+
+class StubClient:
+    """Stands in for provider.GoogleClient with a fixed latency."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def translate(self, text, source="auto", target="ta"):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return STUB_PREFIX + text.strip()
+
+
+class HeadlessRoot:
+    """Minimal tk.Tk replacement: `after` callbacks run inline and nothing ever has focus."""
+
+    def after(self, ms, func=None, *args):
+        if func:
+            func(*args)
+
+    def focus_get(self):
+        return None
+
+    def quit(self):
+        pass
+
+
+class NullWidget:
+    def config(self, **kwargs):
+        pass
+
+    configure = config
+
+
+def _ensure_headless_modules():
+    """Desktop-only modules are never used here; register empty ones if they are not installed."""
+    for name in ("keyboard", "pyautogui", "pyperclip"):
+        try:
+            __import__(name)
+        except Exception:
+            sys.modules[name] = types.ModuleType(name)
+
+
+def _percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(trace, latency=0.2, seed_history=0, sample_every=1.0):
+    """Replay `trace` through the App pipeline and return a metrics dict."""
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # translator keeps history relative to the working directory
+    try:
+        return _run(trace, latency, seed_history, sample_every, workdir)
+    finally:
+        os.chdir(cwd)
+
+
+def _run(trace, latency, seed_history, sample_every, workdir):
+    _ensure_headless_modules()
+
+    import main as app_main
+    import provider
+    import translator
+
+    if seed_history:
+        translator.append_history_rows((f"seed entry {i}", f"{STUB_PREFIX}seed entry {i}") for i in range(seed_history))
+
+    source = ReplaySource(trace)
+    stub = StubClient(latency)
+    provider._client = stub
+    popups = []  # (elapsed, translated text)
+    popup_lock = threading.Lock()
+
+    def record_popup(translated, master=None):
+        with popup_lock:
+            popups.append((source.elapsed(), translated))
+
+    class HeadlessApp(app_main.App):
+        def _window(self):
+            pass
+
+        def _styles(self):
+            pass
+
+        def _widgets(self):
+            self.status_lbl = NullWidget()
+            self.toggle_btn = NullWidget()
+
+        def _poll_status(self):
+            pass
+
+        def _refresh_history(self):
+            # Keep the real cost of reloading history for the "Recent" pane
+            translator.load_history()[-10:]
+
+    app_main.prepare_popup = lambda master, translated: None
+
+    app_main.get_selected_text = source.get_selected_text
+    app_main.show_translation_popup = record_popup
+
+    tracemalloc.start()
+    memory = []  # (history rows, bytes in use)
+    source.begin()
+    app = HeadlessApp(HeadlessRoot())
+    try:
+        while source.elapsed() < source.duration + 2:
+            time.sleep(sample_every)
+            current, _ = tracemalloc.get_traced_memory()
+            memory.append((sum(1 for _ in translator.iter_history()), current))
+    finally:
+        app.running = False
+        app.scheduler.stop()
+    wall = source.elapsed()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    shown = {}
+    for at, translated in popups:
+        text = translated[len(STUB_PREFIX):] if translated.startswith(STUB_PREFIX) else translated
+        shown[text] = shown.get(text, 0) + 1
+        started = source.selection_started(text, at)
+        if started is not None:
+            latencies.append(at - started)
+
+    # Every saved row must pair a selection with the stub's translation of that same selection
+    saved = mispaired = 0
+    for row in translator.iter_history():
+        if len(row) < 2 or row[0].startswith("seed entry "):
+            continue
+        saved += 1
+        if row[1] != STUB_PREFIX + row[0].strip():
+            mispaired += 1
+
+    selections = {text.strip() for _, text in trace if text.strip()}
+    return {
+        "wall": wall,
+        "selections": len(selections),
+        "translated": len(popups),
+        "provider_calls": stub.calls,
+        "throughput": len(popups) / wall if wall else 0.0,
+        "latency": {p: _percentile(latencies, p) for p in (50, 90, 99)},
+        "dropped": len(selections - set(shown)),
+        "duplicated": sum(n - 1 for n in shown.values()),
+        "saved": saved,
+        "mispaired": mispaired,
+        "peak_memory": peak,
+        "memory": memory,
+        "history_dir": os.path.join(workdir, translator.HISTORY_FOLDER),
+    }
+
+
+def report(metrics):
+    print(f"wall time:        {metrics['wall']:.1f} s")
+    print(f"selections:       {metrics['selections']} unique")
+    print(f"translations:     {metrics['translated']} ({metrics['throughput']:.2f}/s)")
+    print(f"provider calls:   {metrics['provider_calls']}")
+    lat = metrics["latency"]
+    print(f"e2e latency:      p50 {lat[50] * 1000:.0f} ms   p90 {lat[90] * 1000:.0f} ms   p99 {lat[99] * 1000:.0f} ms")
+    print(f"dropped:          {metrics['dropped']}")
+    print(f"duplicated:       {metrics['duplicated']}")
+    print(f"history rows:     {metrics['saved']} saved, {metrics['mispaired']} mispaired")
+    print(f"peak memory:      {metrics['peak_memory'] / 1024:.0f} KiB")
+    if metrics["memory"]:
+        print("history rows -> memory in use:")
+        step = max(1, len(metrics["memory"]) // 10)
+        for rows, current in metrics["memory"][::step]:
+            print(f"  {rows:8d} rows   {current / 1024:8.0f} KiB")
+    print(f"history written to {metrics['history_dir']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trace", help="JSONL trace to replay (default: synthetic)")
+    parser.add_argument("--selections", type=int, default=40, help="selections in the synthetic trace")
+    parser.add_argument("--hold", type=float, default=1.6, help="seconds each synthetic selection is held")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub provider latency in seconds")
+    parser.add_argument("--seed-history", type=int, default=0, help="rows of history to start with")
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace) if args.trace else generate_trace(args.selections, args.hold)
+    report(run(trace, latency=args.latency, seed_history=args.seed_history))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,15 @@ import threading
 import time
 import keyboard
 import sys
-import csv
-import os
 
 try:
-    from translator import translate_to_tamil, save_history, load_history, get_history_files
+    from translator import translate_to_tamil, save_history, load_history, rewrite_history
     from utils import get_selected_text, is_valid_selection
-    from gui import show_translation_popup
+    from gui import show_translation_popup, prepare_popup, get_font
+    from language import is_tamil
+    from provider import get_provider_status, STATE_OPEN, STATE_HALF_OPEN
+    from scheduler import Scheduler
+    from compaction import HistoryCompactor
 except ImportError as exc:
     messagebox.showerror("Import Error", str(exc))
     sys.exit(1)
@@ -20,17 +22,26 @@ class App:
     """Main application window."""
 
     START_W, START_H = 400, 460
+    DIALOG_TEXT_CHARS = 120  # Longer selections are documents, not dialog or UI text
+    DEBOUNCE_DELAY = 0.8  # Seconds a selection must stay put before it is translated
+    COMPACT_IDLE = 30  # Seconds without selection activity before history compaction may run
+    COMPACT_STEP_GAP = 0.5  # Pause between compaction steps so translations can slip in
+    COMPACT_INTERVAL = 600  # Seconds between compaction runs
 
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
         self.last_selection = ""
         self.running = False
         self.auto_thread: threading.Thread | None = None
-        self.selection_timer = None
+        self.scheduler = Scheduler()  # One thread for debounce and cooldown expiry
         self.pending_selection = ""
+        self.latest_selection = ""  # Most recent selection seen by the auto loop
         self.recent_translations = {}  # Cache to prevent duplicate translations
         self.translation_cooldown = 5  # Seconds before same word can be translated again
         self.dialog_active = False  # Track if any dialog is open
+        self.recent_shown = None  # Entries currently in the "Recent" pane
+        self.last_activity = time.time()  # Last time a selection was queued for translation
+        self.compactor = HistoryCompactor()
 
         self._window()
         self._styles()
@@ -38,6 +49,8 @@ class App:
 
         # Remove the Alt+H hotkey since we're removing the history button
         self.start()  # begin auto‑translate immediately
+        self._poll_status()
+        self.scheduler.schedule(self.COMPACT_IDLE, self._compact_step, key="compact")
 
     # ───────────────────────────── window & style ───────────────────────────
     def _window(self) -> None:
@@ -98,12 +111,13 @@ class App:
         tk.Label(inp, text="Enter English:", bg="white", font=("Arial", 7)).pack(anchor=tk.W)
         self.input_txt = scrolledtext.ScrolledText(inp, height=3, wrap=tk.WORD, font=("Arial", 8), bg="#F8F8F8", bd=1, relief=tk.SOLID)
         self.input_txt.pack(fill=tk.X, pady=(2, 3))
-        tk.Button(inp, text="Translate", command=self._manual_translate, bg="#4CAF50", fg="white", font=("Arial", 8, "bold"), relief=tk.FLAT, bd=0, pady=3).pack()
+        self.translate_btn = tk.Button(inp, text="Translate", command=self._manual_translate, bg="#4CAF50", fg="white", font=("Arial", 8, "bold"), relief=tk.FLAT, bd=0, pady=3)
+        self.translate_btn.pack()
 
         hwrap = tk.Frame(box, bg="white")
         hwrap.pack(fill=tk.BOTH, expand=True, padx=6, pady=3)
-        tk.Label(hwrap, text="Recent:", bg="white", font=("Arial", 7)).pack(anchor=tk.W)
-        self.history_txt = scrolledtext.ScrolledText(hwrap, height=5, wrap=tk.WORD, font=("Arial", 7), bg="#F0F0F0", bd=1, relief=tk.SOLID, state=tk.DISABLED)
+        tk.Label(hwrap, text="Recent:", bg="white", font=get_font(self.root, ("Arial", 7))).pack(anchor=tk.W)
+        self.history_txt = scrolledtext.ScrolledText(hwrap, height=5, wrap=tk.WORD, font=get_font(self.root, ("Arial", 7)), bg="#F0F0F0", bd=1, relief=tk.SOLID, state=tk.DISABLED)
         self.history_txt.pack(fill=tk.BOTH, expand=True, pady=(2, 0))
 
         # Footer bar - Removed History button
@@ -162,6 +176,15 @@ class App:
         
         text_lower = text.lower().strip()
         
+        # Check for very short text that's likely UI elements
+        if len(text_lower) < 2:
+            return True
+        
+        # The substring checks below would match "ok" in "look" or "no" in "know"
+        # somewhere in any real paragraph, so only apply them to short text
+        if len(text_lower) > self.DIALOG_TEXT_CHARS:
+            return False
+        
         # Check for dialog indicators
         for indicator in dialog_indicators:
             if indicator.lower() in text_lower:
@@ -171,10 +194,6 @@ class App:
         if any(pattern in text_lower for pattern in ["--", "***", ">>>"]):
             return True
             
-        # Check for very short text that's likely UI elements
-        if len(text_lower) < 2:
-            return True
-            
         return False
 
     def _should_translate_selection(self, sel: str) -> bool:
@@ -197,6 +216,10 @@ class App:
         # Skip very short selections (likely UI elements)
         if len(sel.strip()) < 3:
             return False
+
+        # Skip text that is already Tamil (our own popups and history)
+        if is_tamil(sel):
+            return False
         
         # Clean the selection for comparison
         clean_sel = sel.strip().lower()
@@ -233,47 +256,59 @@ class App:
 
     def _delayed_translate(self, sel: str) -> None:
         """Translate selection after a delay to ensure complete selection."""
-        if self.selection_timer:
-            self.selection_timer.cancel()
-        
+        # The auto loop polls faster than the debounce, so don't restart it for the same selection
+        if sel == self.pending_selection and self.scheduler.pending("translate"):
+            return
+        # Rescheduling under the same key replaces the pending job (debounce)
+        self.last_activity = time.time()
         self.pending_selection = sel
-        self.selection_timer = threading.Timer(0.8, self._execute_translation)
-        self.selection_timer.start()
+        # Bind the selection now: the auto loop may queue the next one while this job is translating
+        self.scheduler.schedule(self.DEBOUNCE_DELAY, lambda s=sel: self._execute_translation(s), key="translate")
 
-    def _execute_translation(self) -> None:
+    def _execute_translation(self, sel: str) -> None:
         """Execute the translation if conditions are still met."""
-        if not self.running or not self.pending_selection:
+        if not self.running or not sel:
             return
         
         # Re-check conditions
-        if not self._should_translate_selection(self.pending_selection):
+        if not self._should_translate_selection(sel):
             return
         
-        # Check if selection has changed (user might still be selecting)
-        try:
-            current_sel = get_selected_text()
-            if current_sel and current_sel != self.pending_selection:
-                return  # Selection changed, don't translate
-        except:
-            pass
+        # Check if selection has changed (user might still be selecting); the auto
+        # loop keeps polling, so reuse its last reading instead of copying again
+        current_sel = self.latest_selection
+        if current_sel and current_sel != sel:
+            return  # Selection changed, don't translate
         
-        ta = translate_to_tamil(self.pending_selection)
+        ta = translate_to_tamil(sel)
         if ta:
-            # Mark this translation as recent
-            clean_sel = self.pending_selection.strip().lower()
+            # Mark this translation as recent, and forget it once the cooldown is long past
+            clean_sel = sel.strip().lower()
             self.recent_translations[clean_sel] = time.time()
+            self.scheduler.schedule(self.translation_cooldown * 2,
+                                    lambda: self.recent_translations.pop(clean_sel, None),
+                                    key=("expire", clean_sel))
             
-            # Clean old entries to prevent memory buildup
-            current_time = time.time()
-            self.recent_translations = {
-                k: v for k, v in self.recent_translations.items()
-                if current_time - v < self.translation_cooldown * 2
-            }
-            
-            self.last_selection = self.pending_selection
-            save_history(self.pending_selection, ta)
+            # Let the Tk thread measure the popup while we write history
+            self.root.after(0, prepare_popup, self.root, ta)
+            self.last_selection = sel
+            save_history(sel, ta)
+            self.root.after(0, show_translation_popup, ta, self.root)
             self.root.after(0, self._refresh_history)
-            threading.Thread(target=show_translation_popup, args=(ta,), daemon=True).start()
+
+    def _compact_step(self) -> None:
+        """Run one bounded step of history compaction, but only while the user is idle."""
+        idle = time.time() - self.last_activity >= self.COMPACT_IDLE
+        if not idle or self.dialog_active or self.scheduler.pending("translate"):
+            self.scheduler.schedule(self.COMPACT_IDLE, self._compact_step, key="compact")
+            return
+
+        if self.compactor.step():
+            self.scheduler.schedule(self.COMPACT_STEP_GAP, self._compact_step, key="compact")
+        else:
+            if self.compactor.last_result:
+                self.root.after(0, self._refresh_history)
+            self.scheduler.schedule(self.COMPACT_INTERVAL, self._compact_step, key="compact")
 
     def _auto_loop(self) -> None:
         while self.running:
@@ -282,24 +317,39 @@ class App:
                 sel = get_selected_text()
             except Exception:
                 sel = ""
+            self.latest_selection = sel
             
             if sel and self._should_translate_selection(sel):
                 self._delayed_translate(sel)
 
+    def _update_status(self) -> None:
+        """Show auto‑translate and provider health in the header indicator."""
+        state = get_provider_status()
+        if not self.running:
+            self.status_lbl.config(text="🔴", fg="#FFB6C1")
+        elif state == STATE_OPEN:
+            self.status_lbl.config(text="🟠 offline", fg="#FFB347")
+        elif state == STATE_HALF_OPEN:
+            self.status_lbl.config(text="🟡 retrying", fg="#FFD700")
+        else:
+            self.status_lbl.config(text="🟢", fg="#90EE90")
+
+    def _poll_status(self) -> None:
+        self._update_status()
+        self.root.after(1000, self._poll_status)
+
     # ───────────────────────────── callbacks ────────────────────────────────
     def _toggle_auto(self) -> None:
         if self.running:
             # turn OFF
             self.running = False
-            if self.selection_timer:
-                self.selection_timer.cancel()
+            self.scheduler.cancel("translate")
             self.toggle_btn.config(text="Enable Auto")
-            self.status_lbl.config(text="🔴", fg="#FFB6C1")
         else:
             # turn ON
             self.toggle_btn.config(text="Disable Auto")
-            self.status_lbl.config(text="🟢", fg="#90EE90")
             self.start()
+        self._update_status()
 
     def _manual_translate(self) -> None:
         en = self.input_txt.get("1.0", tk.END).strip()
@@ -308,16 +358,35 @@ class App:
             messagebox.showwarning("Warning", "Enter valid English text.")
             self.dialog_active = False
             return
+        if is_tamil(en):
+            self.dialog_active = True
+            messagebox.showinfo("Info", "This text is already in Tamil.")
+            self.dialog_active = False
+            return
+        # Retries and rate limiting can hold a translation for many seconds, so keep it off the Tk thread
+        self.translate_btn.config(state=tk.DISABLED)
+        threading.Thread(target=self._manual_translate_worker, args=(en,), daemon=True).start()
+
+    def _manual_translate_worker(self, en: str) -> None:
         ta = translate_to_tamil(en)
         if ta:
             save_history(en, ta)
-            self._refresh_history()
+        self.root.after(0, self._manual_translate_done, ta)
+
+    def _manual_translate_done(self, ta) -> None:
+        self.translate_btn.config(state=tk.NORMAL)
+        if ta:
             # Show translation popup for manual translation too
-            threading.Thread(target=show_translation_popup, args=(ta,), daemon=True).start()
+            show_translation_popup(ta, self.root)
+            self._refresh_history()
 
     def _refresh_history(self) -> None:
         """Refresh the history display in the main window."""
         records = load_history()
+        recent = [tuple(record) for record in records[-10:]]
+        if recent == self.recent_shown:
+            return  # Nothing new; skip re-shaping the Tamil text
+        self.recent_shown = recent
         self.history_txt.config(state=tk.NORMAL)
         self.history_txt.delete("1.0", tk.END)
         for en, ta in reversed(records[-10:]):
@@ -352,16 +421,16 @@ class App:
         
         # Title
         title_label = tk.Label(main_frame, text="Translation History Editor", 
-                              font=("Arial", 14, "bold"), bg="#E8E8E8")
+                              font=get_font(self.root, ("Arial", 14, "bold")), bg="#E8E8E8")
         title_label.pack(pady=(0, 10))
         
         # Search frame
         search_frame = tk.Frame(main_frame, bg="#E8E8E8")
         search_frame.pack(fill=tk.X, pady=(0, 10))
         
-        tk.Label(search_frame, text="Search:", bg="#E8E8E8", font=("Arial", 9)).pack(side=tk.LEFT)
+        tk.Label(search_frame, text="Search:", bg="#E8E8E8", font=get_font(self.root, ("Arial", 9))).pack(side=tk.LEFT)
         search_var = tk.StringVar()
-        search_entry = tk.Entry(search_frame, textvariable=search_var, font=("Arial", 9))
+        search_entry = tk.Entry(search_frame, textvariable=search_var, font=get_font(self.root, ("Arial", 9)))
         search_entry.pack(side=tk.LEFT, padx=(5, 10), fill=tk.X, expand=True)
         
         # Buttons frame
@@ -400,21 +469,31 @@ class App:
         # Load history data
         history_data = load_history()
         
-        def populate_tree(filter_text=""):
+        tree_items = []  # Every row in the tree, including rows the search filter has detached
+        
+        def populate_tree(filter_text="", rebuild=True):
             """Populate the tree with history data."""
-            # Clear existing items
-            for item in tree.get_children():
-                tree.delete(item)
+            if rebuild:
+                # Clear existing items
+                if tree_items:
+                    tree.delete(*tree_items)
+                tree_items.clear()
+                
+                for idx, (original, translation) in enumerate(history_data):
+                    tree.insert("", tk.END, iid=idx, text=str(idx + 1), 
+                              values=(original, translation))
+                    tree_items.append(str(idx))
             
-            # Add filtered items
+            # Filter by detaching rows instead of recreating them, so their text isn't laid out again
             for idx, (original, translation) in enumerate(history_data):
                 if not filter_text or filter_text.lower() in original.lower() or filter_text.lower() in translation.lower():
-                    tree.insert("", tk.END, iid=idx, text=str(idx + 1), 
-                              values=(original, translation))
+                    tree.move(str(idx), "", tk.END)
+                else:
+                    tree.detach(str(idx))
         
         def on_search(*args):
             """Filter the tree based on search text."""
-            populate_tree(search_var.get())
+            populate_tree(search_var.get(), rebuild=False)
         
         def edit_selected():
             """Edit the selected translation."""
@@ -447,15 +526,15 @@ class App:
             frame.pack(fill=tk.BOTH, expand=True)
             
             # Original text
-            tk.Label(frame, text="Original Text:", font=("Arial", 10, "bold")).pack(anchor=tk.W)
+            tk.Label(frame, text="Original Text:", font=get_font(self.root, ("Arial", 10, "bold"))).pack(anchor=tk.W)
             original_var = tk.StringVar(value=original_text)
-            original_entry = tk.Entry(frame, textvariable=original_var, font=("Arial", 10))
+            original_entry = tk.Entry(frame, textvariable=original_var, font=get_font(self.root, ("Arial", 10)))
             original_entry.pack(fill=tk.X, pady=(5, 15))
             
             # Translation text
-            tk.Label(frame, text="Tamil Translation:", font=("Arial", 10, "bold")).pack(anchor=tk.W)
+            tk.Label(frame, text="Tamil Translation:", font=get_font(self.root, ("Arial", 10, "bold"))).pack(anchor=tk.W)
             translation_var = tk.StringVar(value=translation_text)
-            translation_entry = tk.Entry(frame, textvariable=translation_var, font=("Arial", 10))
+            translation_entry = tk.Entry(frame, textvariable=translation_var, font=get_font(self.root, ("Arial", 10)))
             translation_entry.pack(fill=tk.X, pady=(5, 20))
             
             # Buttons
@@ -479,19 +558,8 @@ class App:
                 
                 # Save changes to file immediately
                 try:
-                    # Clear existing history files
-                    for file_path in get_history_files():
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
-                    
-                    # Save updated history
-                    if history_data:
-                        from translator import get_latest_history_file
-                        current_file = get_latest_history_file()
-                        with open(current_file, "w", newline='', encoding='utf-8') as file:
-                            writer = csv.writer(file)
-                            for original, translation in history_data:
-                                writer.writerow([original, translation])
+                    # Rewrite history with the updated entries
+                    rewrite_history(history_data)
                     
                     # Refresh the main window history display
                     self._refresh_history()
@@ -503,9 +571,9 @@ class App:
                     messagebox.showerror("Error", f"Failed to save changes: {str(e)}")
             
             tk.Button(btn_frame, text="Save", command=save_edit, 
-                     bg="#4CAF50", fg="white", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=(0, 10))
+                     bg="#4CAF50", fg="white", font=get_font(self.root, ("Arial", 10, "bold"))).pack(side=tk.LEFT, padx=(0, 10))
             tk.Button(btn_frame, text="Cancel", command=edit_dialog.destroy,
-                     bg="#f44336", fg="white", font=("Arial", 10, "bold")).pack(side=tk.LEFT)
+                     bg="#f44336", fg="white", font=get_font(self.root, ("Arial", 10, "bold"))).pack(side=tk.LEFT)
         
         def delete_selected():
             """Delete the selected translation(s)."""
@@ -524,19 +592,8 @@ class App:
                 
                 # Save changes to file immediately
                 try:
-                    # Clear existing history files
-                    for file_path in get_history_files():
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
-                    
-                    # Save updated history
-                    if history_data:
-                        from translator import get_latest_history_file
-                        current_file = get_latest_history_file()
-                        with open(current_file, "w", newline='', encoding='utf-8') as file:
-                            writer = csv.writer(file)
-                            for original, translation in history_data:
-                                writer.writerow([original, translation])
+                    # Rewrite history with the updated entries
+                    rewrite_history(history_data)
                     
                     # Refresh the main window history display
                     self._refresh_history()
@@ -557,9 +614,7 @@ class App:
                 # Save changes to file immediately
                 try:
                     # Clear existing history files
-                    for file_path in get_history_files():
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
+                    rewrite_history([])
                     
                     # Refresh the main window history display
                     self._refresh_history()
@@ -575,13 +630,13 @@ class App:
         
         # Buttons
         tk.Button(button_frame, text="Edit Selected", command=edit_selected,
-                 bg="#2196F3", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=(0, 5))
+                 bg="#2196F3", fg="white", font=get_font(self.root, ("Arial", 9, "bold"))).pack(side=tk.LEFT, padx=(0, 5))
         tk.Button(button_frame, text="Delete Selected", command=delete_selected,
-                 bg="#f44336", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=5)
+                 bg="#f44336", fg="white", font=get_font(self.root, ("Arial", 9, "bold"))).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Clear All", command=clear_all_history,
-                 bg="#FF5722", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=5)
+                 bg="#FF5722", fg="white", font=get_font(self.root, ("Arial", 9, "bold"))).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Close", command=on_close,
-                 bg="#9E9E9E", fg="white", font=("Arial", 9, "bold")).pack(side=tk.RIGHT)
+                 bg="#9E9E9E", fg="white", font=get_font(self.root, ("Arial", 9, "bold"))).pack(side=tk.RIGHT)
         
         # Initial population
         populate_tree()
@@ -592,8 +647,7 @@ class App:
     def _quit(self) -> None:
         if messagebox.askyesno("Quit", "Are you sure?"):
             self.running = False
-            if self.selection_timer:
-                self.selection_timer.cancel()
+            self.scheduler.stop()
             self.root.quit()
 
 def main() -> None:
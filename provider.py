@@ -0,0 +1,196 @@
+import random
+import threading
+import time
+
+import requests
+from bs4 import BeautifulSoup
+from deep_translator.constants import BASE_URLS
+from deep_translator.exceptions import NotValidLength, RequestError, TooManyRequests, TranslationNotFound
+from deep_translator.validate import request_failed
+from requests.adapters import HTTPAdapter
+
+RATE_LIMIT_PER_SEC = 2.0      # Sustained provider calls per second
+RATE_LIMIT_BURST = 5          # Calls allowed back-to-back before throttling kicks in
+REQUEST_TIMEOUT = 5.0         # Seconds before a single provider call is abandoned
+MAX_CHARS = 5000              # Longest text the provider accepts in one request
+POOL_SIZE = 8                 # Keep-alive connections shared by the worker threads
+MAX_RETRIES = 3               # Attempts per translation before giving up
+BACKOFF_BASE = 0.5            # Seconds, doubled on every retry
+BACKOFF_MAX = 8.0
+BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failures that open the circuit
+BREAKER_RESET_TIMEOUT = 30.0   # Seconds the circuit stays open before a probe
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Errors worth retrying; anything else (e.g. text not found) fails immediately
+RETRYABLE_ERRORS = (TooManyRequests, RequestError, requests.exceptions.RequestException)
+
+
+class ProviderUnavailable(Exception):
+    """Raised when the provider cannot be reached (circuit open, throttled or retries exhausted)."""
+
+
+class GoogleClient:
+    """Long-lived Google Translate client reusing pooled keep-alive connections across threads.
+
+    Speaks the same endpoint and page format as deep_translator's GoogleTranslator,
+    which opens a fresh connection (and TLS handshake) for every call.
+    """
+
+    def __init__(self, base_url: str = BASE_URLS["GOOGLE_TRANSLATE"], pool_size: int = POOL_SIZE,
+                 timeout: float = REQUEST_TIMEOUT) -> None:
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def translate(self, text: str, source: str = "auto", target: str = "ta") -> str:
+        text = text.strip()
+        if not text or source == target:
+            return text
+        if len(text) >= MAX_CHARS:
+            raise NotValidLength(text, 0, MAX_CHARS)
+
+        response = self.session.get(self.base_url, params={"tl": target, "sl": source, "q": text},
+                                    timeout=self.timeout)
+        if response.status_code == 429:
+            raise TooManyRequests()
+        if request_failed(status_code=response.status_code):
+            raise RequestError()
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        element = soup.find("div", {"class": "t0"}) or soup.find("div", {"class": "result-container"})
+        if not element:
+            raise TranslationNotFound(text)
+        return element.get_text(strip=True)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting how fast we call the provider."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout: float) -> bool:
+        """Take one token, waiting up to `timeout` seconds. Returns False if none became available."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated provider errors, probing again after a cool-off."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = STATE_CLOSED
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            if self._state == STATE_OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._state = STATE_HALF_OPEN
+                self.probe_in_flight = False
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go to the provider right now."""
+        state = self.state
+        with self.lock:
+            if state == STATE_CLOSED:
+                return True
+            if state == STATE_HALF_OPEN and not self.probe_in_flight:
+                # Only one probe at a time while half open
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe slot that was never used for a call."""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self._state = STATE_CLOSED
+            self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self._state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = STATE_OPEN
+                self.opened_at = time.monotonic()
+                self.probe_in_flight = False
+
+
+_bucket = TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
+_breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+_client = GoogleClient()
+
+
+def get_provider_status():
+    """Return the circuit breaker state: 'closed', 'open' or 'half_open'."""
+    return _breaker.state
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def call_provider(text, source="auto"):
+    """Translate text to Tamil through the provider with rate limiting, retries and the circuit breaker."""
+    for attempt in range(MAX_RETRIES):
+        if not _breaker.allow_request():
+            raise ProviderUnavailable("circuit open")
+        if not _bucket.acquire(REQUEST_TIMEOUT):
+            # No call was made, so don't hold on to the half-open probe slot
+            _breaker.release_probe()
+            raise ProviderUnavailable("rate limited")
+
+        try:
+            result = _client.translate(text, source=source)
+        except RETRYABLE_ERRORS:
+            _breaker.record_failure()
+            if attempt < MAX_RETRIES - 1:
+                time.sleep(backoff_delay(attempt))
+            continue
+        except Exception:
+            # Not a connectivity problem, the provider just cannot translate this text
+            _breaker.record_success()
+            raise
+        _breaker.record_success()
+        return result
+
+    raise ProviderUnavailable("retries exhausted")
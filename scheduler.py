@@ -0,0 +1,74 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class Scheduler:
+    """Runs delayed jobs on a single worker thread.
+
+    Scheduling a job under a key that is already pending replaces it, which gives
+    debounce for free; cancelled or replaced jobs are dropped lazily from the heap.
+    """
+
+    def __init__(self) -> None:
+        self._heap = []   # (due, seq, key), may contain stale entries
+        self._jobs = {}   # key -> (seq, func) for live jobs only
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay: float, func, key=None):
+        """Run `func` after `delay` seconds, replacing any pending job with the same key."""
+        with self._cond:
+            seq = next(self._seq)
+            if key is None:
+                key = ("job", seq)
+            self._jobs[key] = (seq, func)
+            heapq.heappush(self._heap, (time.monotonic() + delay, seq, key))
+            self._cond.notify()
+        return key
+
+    def cancel(self, key) -> None:
+        """Drop a pending job; does nothing if it already ran or never existed."""
+        with self._cond:
+            self._jobs.pop(key, None)
+
+    def pending(self, key) -> bool:
+        with self._cond:
+            return key in self._jobs
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._jobs.clear()
+            self._cond.notify()
+
+    def _is_stale(self, entry) -> bool:
+        _, seq, key = entry
+        job = self._jobs.get(key)
+        return job is None or job[0] != seq
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    while self._heap and self._is_stale(self._heap[0]):
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if not self._running:
+                    return
+                _, _, key = heapq.heappop(self._heap)
+                _, func = self._jobs.pop(key)
+            try:
+                func()
+            except Exception:
+                pass
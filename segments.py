@@ -0,0 +1,313 @@
+import csv
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = "manifest.lock"
+ID_WIDTH = 6  # translation_history_000012.csv sorts correctly as plain text too
+LOCK_STALE_AFTER = 10.0  # Seconds after which a lock file is assumed left behind by a crashed process
+TAIL_ROWS = 200  # Rows of the active segment kept in memory for duplicate and cache lookups
+
+
+class SegmentManager:
+    """Owns the rotated history files ("segments") and a small manifest describing them.
+
+    Segment IDs only ever grow and are zero-padded, so names sort in creation
+    order. Row and byte counts of the active (newest) segment are kept in memory,
+    which makes the rotation check on each write O(1); the manifest is rewritten
+    when the set of segments changes and by save_counts() on exit, which records
+    the active segment's final counts. At startup only the active segment's size
+    is checked against the manifest, so there is no directory scan or line count
+    unless the manifest is missing, or out of date because the last process
+    writing history did not exit cleanly.
+
+    Other processes (e.g. ``history_io.py import`` while the app is open) may
+    change the same folder, so the manifest is re-read whenever it changed on
+    disk, and every change to it is made under a lock file.
+    """
+
+    def __init__(self, folder: str, base: str, max_rows: int, max_bytes: int) -> None:
+        self.folder = os.path.abspath(folder)  # Stable even if the working directory changes later
+        self.base = base
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.lock = threading.RLock()
+        self.segments = []  # [{"id", "rows", "bytes"}], oldest first; the last one is active
+        self.next_id = 1
+        self._manifest_signature = None  # stat of the manifest we last read or wrote
+        self._tail = deque(maxlen=TAIL_ROWS)
+        self._tail_key = None  # (segment id, bytes) the tail is valid for
+        self._load()
+
+    # ───────────────────────────── paths ─────────────────────────────
+    def path_for(self, segment_id: int) -> str:
+        return os.path.join(self.folder, f"{self.base}_{segment_id:0{ID_WIDTH}d}.csv")
+
+    def paths(self):
+        """Segment paths, oldest first."""
+        with self.lock:
+            self._sync()
+            return [self.path_for(seg["id"]) for seg in self.segments]
+
+    def active_path(self) -> str:
+        with self.lock:
+            if not self.segments:
+                return self.path_for(self.next_id)
+            return self.path_for(self.segments[-1]["id"])
+
+    # ───────────────────────────── manifest ─────────────────────────────
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.folder, MANIFEST_NAME)
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialise manifest changes with other processes using the same history folder."""
+        path = os.path.join(self.folder, LOCK_NAME)
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path) > LOCK_STALE_AFTER:
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue  # Released (or broken) in the meantime
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(path)
+
+    def _signature(self):
+        stat = os.stat(self.manifest_path)
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _save(self) -> None:
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump({"next_id": self.next_id, "segments": self.segments}, file)
+        os.replace(tmp, self.manifest_path)
+        self._manifest_signature = self._signature()
+
+    def _read_manifest(self) -> None:
+        signature = self._signature()
+        with open(self.manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        self.segments = manifest["segments"]
+        self.next_id = max(self.next_id, manifest["next_id"])
+        self._manifest_signature = signature
+
+    def _sync(self) -> None:
+        """Re-read the manifest if another process replaced it since we last read or wrote it."""
+        try:
+            if self._signature() != self._manifest_signature:
+                self._read_manifest()
+        except (OSError, ValueError, KeyError):
+            pass  # Missing or half-written; keep what we have
+
+    def _sync_active(self) -> None:
+        """Re-read the manifest and recount the active segment if someone else appended to it."""
+        self._sync()
+        active = self.segments[-1] if self.segments else None
+        if active:
+            path = self.path_for(active["id"])
+            if os.path.exists(path) and os.path.getsize(path) != active["bytes"]:
+                active["rows"], active["bytes"] = self._measure(path)
+
+    def _load(self) -> None:
+        with self.lock, self._file_lock():
+            try:
+                self._read_manifest()
+                if self.segments and not os.path.exists(self.active_path()):
+                    raise ValueError("manifest out of date")
+            except Exception:
+                self._rebuild()
+                return
+
+            # Only the active segment is appended to outside a manifest save; recheck it cheaply
+            active = self.segments[-1] if self.segments else None
+            if active and os.path.getsize(self.active_path()) != active["bytes"]:
+                active["rows"], active["bytes"] = self._measure(self.active_path())
+                self._save()
+
+    def _rebuild(self) -> None:
+        """Recreate the manifest from the files on disk, migrating old unpadded names."""
+        pattern = re.compile(rf"^{re.escape(self.base)}_(\d+)\.csv$")
+        found = []
+        for name in os.listdir(self.folder):
+            match = pattern.match(name)
+            if match:
+                found.append((int(match.group(1)), name))
+        found.sort()  # Numeric, so _10 comes after _2; a padded name sorts before its legacy twin
+
+        self.segments = []
+        self.next_id = found[-1][0] + 1 if found else 1
+        used = set()
+        for segment_id, name in found:
+            path = self.path_for(segment_id)
+            if segment_id in used:
+                # e.g. translation_history_2.csv next to an already migrated translation_history_000002.csv
+                # (history folders copied between machines): never overwrite, give it a fresh ID
+                segment_id = self._claim_id()
+                path = self.path_for(segment_id)
+            if os.path.join(self.folder, name) != path:
+                os.replace(os.path.join(self.folder, name), path)
+            used.add(segment_id)
+            rows, size = self._measure(path)
+            self.segments.append({"id": segment_id, "rows": rows, "bytes": size})
+        self._save()
+
+    @staticmethod
+    def _measure(path):
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            rows = sum(1 for _ in csv.reader(file))
+        return rows, os.path.getsize(path)
+
+    def save_counts(self) -> None:
+        """Record the active segment's current row and byte counts in the manifest."""
+        with self.lock, self._file_lock():
+            self._sync_active()
+            if self.segments:
+                self._save()
+
+    # ───────────────────────────── reads ─────────────────────────────
+    def recent_rows(self):
+        """The last TAIL_ROWS rows of the active segment, oldest first.
+
+        Served from memory; the file is only read again when it changed behind
+        our back (another process appended, or history was replaced).
+        """
+        with self.lock:
+            self._sync_active()
+            if not self.segments:
+                return []
+            active = self.segments[-1]
+            key = (active["id"], active["bytes"])
+            if key != self._tail_key:
+                self._tail.clear()
+                try:
+                    with open(self.path_for(active["id"]), "r", newline="", encoding="utf-8") as file:
+                        self._tail.extend(csv.reader(file))
+                except OSError:
+                    pass
+                self._tail_key = key
+            return list(self._tail)
+
+    # ───────────────────────────── writes ─────────────────────────────
+    def _claim_id(self) -> int:
+        """Next unused segment ID, skipping any file another process already created."""
+        while os.path.exists(self.path_for(self.next_id)):
+            self.next_id += 1
+        segment_id = self.next_id
+        self.next_id += 1
+        return segment_id
+
+    def _start_segment(self) -> dict:
+        segment = {"id": self._claim_id(), "rows": 0, "bytes": 0}
+        open(self.path_for(segment["id"]), "a", encoding="utf-8").close()
+        self.segments.append(segment)
+        self._save()
+        return segment
+
+    def _rotate(self) -> None:
+        """Start a new segment unless another process already started a fresh one."""
+        with self._file_lock():
+            self._sync_active()
+            if not self.segments or self._is_full(self.segments[-1]):
+                self._start_segment()
+
+    def _is_full(self, segment) -> bool:
+        return segment["rows"] >= self.max_rows or segment["bytes"] >= self.max_bytes
+
+    def new_segment(self) -> str:
+        """Close the active segment and return the path of a fresh one."""
+        with self.lock, self._file_lock():
+            self._sync()
+            return self.path_for(self._start_segment()["id"])
+
+    def append(self, rows) -> int:
+        """Append (original, translated) rows, rotating when the active segment is full."""
+        written = 0
+        with self.lock:
+            self._sync_active()
+            file = None
+            try:
+                for row in rows:
+                    if not self.segments or self._is_full(self.segments[-1]):
+                        if file is not None:
+                            file.close()
+                            file = None
+                        self._rotate()
+                    segment = self.segments[-1]
+                    if file is None:
+                        file = open(self.path_for(segment["id"]), "a", newline="", encoding="utf-8")
+                        writer = csv.writer(file)
+                    writer.writerow(row)
+                    file.flush()
+                    tail_current = self._tail_key == (segment["id"], segment["bytes"])
+                    segment["rows"] += 1
+                    segment["bytes"] = file.tell()
+                    if tail_current or segment["rows"] == 1:
+                        if segment["rows"] == 1:
+                            self._tail.clear()
+                        self._tail.append(list(row))
+                        self._tail_key = (segment["id"], segment["bytes"])
+                    written += 1
+            finally:
+                if file is not None:
+                    file.close()
+        return written
+
+    def clear(self) -> None:
+        """Delete every segment. IDs keep counting up."""
+        with self.lock, self._file_lock():
+            self._sync()
+            for seg in self.segments:
+                path = self.path_for(seg["id"])
+                if os.path.exists(path):
+                    os.remove(path)
+            self.segments = []
+            self._save()
+
+    def rewrite(self, rows) -> int:
+        """Replace the whole history with `rows`."""
+        with self.lock:
+            self.clear()
+            return self.append(rows)
+
+    def replace_runs(self, runs) -> bool:
+        """Swap runs of consecutive segments for already-written files given as (path, rows, bytes).
+
+        `runs` is a list of (old segment paths, prepared files). Each run must
+        produce no more files than it replaces; they take over the run's own IDs
+        in order, so segment order and every other segment are left alone. If
+        any old segment is gone (history changed in the meantime), nothing is
+        replaced.
+        """
+        with self.lock, self._file_lock():
+            self._sync_active()
+            index = {self.path_for(seg["id"]): seg for seg in self.segments}
+            if any(len(prepared) > len(old) or any(path not in index for path in old) for old, prepared in runs):
+                return False
+            dropped = []
+            for old, prepared in runs:
+                for path, (tmp, rows, size) in zip(old, prepared):
+                    os.replace(tmp, path)
+                    index[path]["rows"], index[path]["bytes"] = rows, size
+                dropped.extend(old[len(prepared):])
+            # Merged rows now live in the earlier files, so the later ones can go
+            self.segments = [seg for seg in self.segments if self.path_for(seg["id"]) not in dropped]
+            self._save()
+            for path in dropped:
+                if os.path.exists(path):
+                    os.remove(path)
+            return True
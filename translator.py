@@ -1,59 +1,56 @@
+import atexit
 import os
 import csv
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from deep_translator import GoogleTranslator
+from concurrent.futures import ThreadPoolExecutor
+from provider import call_provider, ProviderUnavailable
+from language import detect_language
+from chunking import split_into_chunks, join_chunks
+from segments import SegmentManager
 
 HISTORY_FOLDER = "history"
 HISTORY_FILE_BASE = "translation_history"
-HISTORY_LIMIT = 500
+HISTORY_LIMIT = 500  # Rows per history segment
+HISTORY_SEGMENT_BYTES = 256 * 1024  # Segments also rotate once they reach this size
+CHUNK_WORKERS = 5  # Matches the provider's rate limit burst so a document goes out at once
+CHUNK_CACHE_SIZE = 512  # Translated chunks of long documents kept in memory (they never go to history)
 
 if not os.path.exists(HISTORY_FOLDER):
     os.makedirs(HISTORY_FOLDER)
 
+_segments = SegmentManager(HISTORY_FOLDER, HISTORY_FILE_BASE, HISTORY_LIMIT, HISTORY_SEGMENT_BYTES)
+
+# Held by everything that writes history files, so background compaction never swaps files mid-write
+history_lock = _segments.lock
+
+_chunk_executor = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="chunk")
+_chunk_cache = OrderedDict()  # (chunk, source) -> translation, least recently used first
+_chunk_cache_lock = threading.Lock()
+
 def get_history_files():
-    files = [f for f in os.listdir(HISTORY_FOLDER) if f.startswith(HISTORY_FILE_BASE)]
-    files.sort()
-    return [os.path.join(HISTORY_FOLDER, f) for f in files]
+    """History segment files, oldest first (from the manifest, no directory scan)."""
+    return _segments.paths()
 
 def get_latest_history_file():
-    files = get_history_files()
-    if not files:
-        return os.path.join(HISTORY_FOLDER, f"{HISTORY_FILE_BASE}_1.csv")
-    return files[-1]
+    return _segments.active_path()
 
 def get_new_history_file():
-    files = get_history_files()
-    new_index = len(files) + 1
-    return os.path.join(HISTORY_FOLDER, f"{HISTORY_FILE_BASE}_{new_index}.csv")
-
-def count_rows_in_file(filepath):
-    if not os.path.exists(filepath):
-        return 0
-    with open(filepath, "r", encoding="utf-8") as f:
-        return sum(1 for ac_ in f)
+    return _segments.new_segment()
 
 def is_duplicate_translation(original, translated):
     """Check if this exact translation already exists in recent history."""
     try:
-        # Check only the latest history file for performance
-        current_file = get_latest_history_file()
-        if not os.path.exists(current_file):
-            return False
-        
         original_lower = original.lower().strip()
         translated_lower = translated.lower().strip()
         
-        with open(current_file, "r", encoding="utf-8") as file:
-            reader = csv.reader(file)
-            # Check last 100 entries for duplicates
-            rows = list(reader)
-            recent_rows = rows[-100:] if len(rows) > 100 else rows
-            
-            for row in recent_rows:
-                if len(row) >= 2:
-                    if (row[0].lower().strip() == original_lower and 
-                        row[1].lower().strip() == translated_lower):
-                        return True
+        # Check the last 100 entries of the latest history file, kept in memory
+        for row in _segments.recent_rows()[-100:]:
+            if len(row) >= 2:
+                if (row[0].lower().strip() == original_lower and 
+                    row[1].lower().strip() == translated_lower):
+                    return True
         return False
     except Exception:
         return False
@@ -64,55 +61,76 @@ def save_history(original, translated):
     if is_duplicate_translation(original, translated):
         return
     
-    current_file = get_latest_history_file()
-    if count_rows_in_file(current_file) >= HISTORY_LIMIT:
-        current_file = get_new_history_file()
-    
-    with open(current_file, "a", newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        writer.writerow([original, translated])
+    _segments.append([(original, translated)])
 
-def load_history():
-    """Load all translation history."""
-    rows = []
+def flush_history():
+    """Store the active segment's counts in the manifest so the next start needn't recount it."""
+    try:
+        _segments.save_counts()
+    except Exception:
+        pass
+
+atexit.register(flush_history)
+
+def append_history_rows(rows):
+    """Append many (original, translated) rows, rotating segments as they fill up."""
+    return _segments.append((original, translated) for original, translated in rows)
+
+def rewrite_history(rows):
+    """Replace the whole history with the given (original, translated) rows."""
+    return _segments.rewrite((original, translated) for original, translated in rows)
+
+def replace_history_runs(runs):
+    """Swap runs of consecutive segments for already-written files; see SegmentManager.replace_runs."""
+    return _segments.replace_runs(runs)
+
+def iter_history():
+    """Yield every history row, oldest first, one file at a time."""
     for f in get_history_files():
         try:
             with open(f, "r", encoding="utf-8") as file:
-                rows.extend(list(csv.reader(file)))
+                yield from csv.reader(file)
         except Exception:
             continue
-    return rows
+
+def load_history():
+    """Load all translation history."""
+    return list(iter_history())
 
 def get_existing_translation(text):
     """Check if we already have a translation for this text."""
     try:
-        # Check recent history first for performance
-        current_file = get_latest_history_file()
-        if not os.path.exists(current_file):
-            return None
-        
         text_lower = text.lower().strip()
         
-        with open(current_file, "r", encoding="utf-8") as file:
-            reader = csv.reader(file)
-            rows = list(reader)
-            # Check last 200 entries
-            recent_rows = rows[-200:] if len(rows) > 200 else rows
-            
-            for row in recent_rows:
-                if len(row) >= 2:
-                    if row[0].lower().strip() == text_lower:
-                        return row[1]  # Return existing translation
+        # Check the last 200 entries of the latest history file, kept in memory
+        for row in _segments.recent_rows():
+            if len(row) >= 2:
+                if row[0].lower().strip() == text_lower:
+                    return row[1]  # Return existing translation
         return None
     except Exception:
         return None
 
+def get_stale_translation(text):
+    """Search all history files, newest first, for a translation to serve while the provider is down."""
+    text_lower = text.lower().strip()
+    for f in reversed(get_history_files()):
+        try:
+            with open(f, "r", encoding="utf-8") as file:
+                found = None
+                for row in csv.reader(file):
+                    if len(row) >= 2 and row[0].lower().strip() == text_lower:
+                        found = row[1]  # Keep going, later rows are more recent
+                if found:
+                    return found
+        except Exception:
+            continue
+    return None
+
 def clear_all_history():
     """Clear all translation history files."""
     try:
-        for file_path in get_history_files():
-            if os.path.exists(file_path):
-                os.remove(file_path)
+        _segments.clear()
         return True
     except Exception:
         return False
@@ -131,13 +149,7 @@ def update_history_entry(old_original, old_translated, new_original, new_transla
         
         if updated:
             # Rewrite all history files
-            clear_all_history()
-            if history:
-                current_file = get_latest_history_file()
-                with open(current_file, "w", newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    for original, translation in history:
-                        writer.writerow([original, translation])
+            rewrite_history(history)
         
         return updated
     except Exception:
@@ -155,13 +167,7 @@ def delete_history_entry(original, translated):
         
         if len(history) < original_length:
             # Rewrite all history files
-            clear_all_history()
-            if history:
-                current_file = get_latest_history_file()
-                with open(current_file, "w", newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    for orig, trans in history:
-                        writer.writerow([orig, trans])
+            rewrite_history(history)
             return True
         return False
     except Exception:
@@ -175,7 +181,7 @@ def get_history_stats():
         files_count = len(get_history_files())
         
         # Count unique entries
-        unique_entries = len(set(history))
+        unique_entries = len(set(map(tuple, history)))
         duplicates = total_entries - unique_entries
         
         return {
@@ -192,24 +198,71 @@ def get_history_stats():
             'files_count': 0
         }
 
+def _translate_piece(text, source, use_history=True):
+    """Translate one provider-sized piece of text, using cache if available.
+
+    Chunks of long documents are never history entries, so they pass use_history=False
+    to skip the history lookups that cannot find them.
+    """
+    # First check if we already have this translation
+    if use_history:
+        existing = get_existing_translation(text)
+        if existing:
+            return existing
+
+    # If not found, translate it
+    try:
+        translated = call_provider(text, source=source)
+    except ProviderUnavailable:
+        # Provider is down or throttled, fall back to anything we translated before
+        return get_stale_translation(text) if use_history else None
+    if not translated:
+        return None
+
+    # Clean up the translation
+    return translated.strip()
+
+def _translate_chunk(text, source):
+    """Translate one chunk of a long document, remembering the result in the chunk cache."""
+    key = (text.lower().strip(), source)
+    with _chunk_cache_lock:
+        cached = _chunk_cache.get(key)
+        if cached is not None:
+            _chunk_cache.move_to_end(key)
+            return cached
+
+    translated = _translate_piece(text, source, use_history=False)
+    if translated:
+        with _chunk_cache_lock:
+            _chunk_cache[key] = translated
+            if len(_chunk_cache) > CHUNK_CACHE_SIZE:
+                _chunk_cache.popitem(last=False)
+    return translated
+
 def translate_to_tamil(text):
-    """Translate text to Tamil, using cache if available."""
+    """Translate text to Tamil, splitting long text into chunks translated in parallel.
+
+    Returns None for text that is already Tamil, so callers don't record it as its own translation.
+    """
     try:
-        # First check if we already have this translation
+        # Text that is already Tamil needs no round trip
+        source = detect_language(text)
+        if source == "ta":
+            return None
+
+        pairs = split_into_chunks(text)
+        if len(pairs) <= 1:
+            return _translate_piece(text, source)
+
+        # The whole document may already be in history from an earlier selection
         existing = get_existing_translation(text)
         if existing:
             return existing
-        
-        # If not found, translate it
-        translated = GoogleTranslator(source='auto', target='ta').translate(text)
-        if translated.startswith("[Error") or "text length" in translated:
-            return None
-        
-        # Clean up the translation
-        if translated:
-            translated = translated.strip()
-        
-        return translated
+
+        translated = list(_chunk_executor.map(lambda pair: _translate_chunk(pair[0], source), pairs))
+        if any(not t for t in translated):
+            # One scan of all history for the whole document, not one per chunk
+            return get_stale_translation(text)
+        return join_chunks(translated, pairs)
     except Exception:
         return None
-    
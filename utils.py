@@ -2,6 +2,8 @@ import pyperclip
 import pyautogui
 import time
 
+MAX_SELECTION_CHARS = 20000  # Long text is chunked by the translator, this only guards against runaway selections
+
 def get_selected_text():
     """Get the currently selected text by copying it to clipboard."""
     original_clipboard = pyperclip.paste()
@@ -16,6 +18,6 @@ def is_valid_selection(text):
     cleaned = text.strip()
     return (
         cleaned != "" and
-        len(cleaned) < 200 and
+        len(cleaned) <= MAX_SELECTION_CHARS and
         any(c.isalpha() for c in cleaned)
     )
\ No newline at end of file